@@ -0,0 +1,68 @@
+"""Functions for validating the to-paths and IDs of many records at once."""
+import array
+import functools
+import re
+
+import variables
+
+# Result codes of a record, combined as bits. 0 means that the record is valid.
+INVALID_TO_PATH = 1
+INVALID_DESTINATION_ID = 2
+NON_MATCHING_IDS = 4
+
+IMAGE_ID_PATTERN = re.compile(r"(?:^|/)(?P<id>\d+)$")
+DESTINATION_ID_PATTERN = re.compile(r"\d+")
+
+
+@functools.lru_cache(maxsize=8)
+def get_to_path_pattern(valid_to_paths: frozenset[str]) -> tuple[re.Pattern, dict[str, int | None]]:
+    """Compile the valid to-paths into one pattern, with a group for each to-path and its ID.
+
+    Return the pattern and the group numbers of the IDs by the name of the to-path group.
+    """
+    alternatives = []
+    for i, path in enumerate(sorted(valid_to_paths)):
+        path_regex = re.escape(path).replace(re.escape("{id}"), f"(?P<id{i}>[^/]+)", 1)
+        alternatives.append(f"(?P<path{i}>{path_regex})")
+
+    pattern = re.compile("|".join(alternatives))
+    id_groups = {}
+    for i in range(len(valid_to_paths)):
+        id_groups[f"path{i}"] = pattern.groupindex.get(f"id{i}")
+
+    return pattern, id_groups
+
+
+def validate_records(sources: list[str], destinations: list[str]) -> array.array:
+    """Validate the to-paths and IDs of records, given as parallel lists of from-records and to-records.
+
+    Return an array with the result code of each record.
+    """
+    pattern, id_groups = get_to_path_pattern(frozenset(variables.PROGRESS.valid_to_paths))
+    fullmatch = pattern.fullmatch
+    search_image_id = IMAGE_ID_PATTERN.search
+    search_destination_id = DESTINATION_ID_PATTERN.search
+
+    results = array.array("B", bytes(len(sources)))
+    for i, (source, destination) in enumerate(zip(sources, destinations)):
+        match = fullmatch(destination)
+        if not match:
+            results[i] = INVALID_TO_PATH
+            continue
+
+        id_group = id_groups[match.lastgroup]
+        if id_group is None:
+            destination_id = search_destination_id(destination)
+            destination_id = destination_id.group() if destination_id else None
+        else:
+            destination_id = match.group(id_group)
+            if not (destination_id.isascii() and destination_id.isdigit()):
+                results[i] = INVALID_DESTINATION_ID
+                continue
+
+        image_id = search_image_id(source)
+        if image_id and destination_id is not None and int(image_id.group("id")) != int(destination_id):
+            results[i] = NON_MATCHING_IDS
+
+    return results
+
@@ -0,0 +1,54 @@
+"""Archive class."""
+import io
+import os
+import zipfile
+
+
+class Archive:
+    """Zip archive used as a graphics location.
+
+    Member paths are handled as if the archive was a directory, for example C:\\graphics\\faces.zip\\a\\1.png. The file
+    listing comes from the central directory of the archive, so only the config files are ever decompressed.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Initialize object."""
+        self.name = name
+        self.files = set()
+        self.__handle = None  # Opened once, as every opening reads the whole central directory again.
+
+    def __getstate__(self) -> dict:
+        """Get the state for pickling, without the open archive."""
+        state = self.__dict__.copy()
+        state["_Archive__handle"] = None
+        return state
+
+    @property
+    def handle(self) -> zipfile.ZipFile:
+        """Get the open archive."""
+        if self.__handle is None:
+            self.__handle = zipfile.ZipFile(self.name)
+
+        return self.__handle
+
+    def has_file(self, filepath: str) -> bool:
+        """Check if the archive has a file in the path."""
+        return filepath in self.files
+
+    def get_member_name(self, filepath: str) -> str:
+        """Get the name of the archive member that the path points to."""
+        return os.path.relpath(filepath, self.name).replace(os.sep, "/")
+
+    def get_members(self) -> list[zipfile.ZipInfo]:
+        """Get the file members of the archive without reading their contents."""
+        return [member for member in self.handle.infolist() if not member.is_dir()]
+
+    def get_path(self, member: zipfile.ZipInfo) -> str:
+        """Get the path of an archive member."""
+        return os.path.normpath(os.path.join(self.name, member.filename))
+
+    def read_text(self, filepath: str) -> str:
+        """Read a text file from the archive."""
+        with self.handle.open(self.get_member_name(filepath)) as member:
+            with io.TextIOWrapper(member, encoding="utf-8") as file:
+                return file.read()
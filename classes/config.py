@@ -1,6 +1,7 @@
 """Config class."""
 import re
 
+import batch
 import logger
 import validator
 import variables
@@ -15,6 +16,32 @@ class Config:
         """Remove comments from the config."""
         return re.sub("<!--.*?-->", "", string, flags=re.DOTALL).strip()
 
+    @staticmethod
+    def get_header(booleans: dict[str, bool | None]) -> str:
+        """Get the beginning of a config file, up to the records."""
+        indent = variables.PROGRESS.config_format["indent"]
+        string = "<record>\n"
+        boolean_values = {True: "true", False: "false", None: "none"}
+        for key, value in booleans.items():
+            if value is None:
+                continue
+            string += f'{indent}<boolean id="{key}" value="{boolean_values[value]}"/>\n'
+
+        string += f'{indent}<list id="maps">\n'
+        return string
+
+    @staticmethod
+    def get_record_line(from_record: str, to_record: str) -> str:
+        """Get a record of a config file as a line."""
+        indent = variables.PROGRESS.config_format["indent"]
+        return f'{indent * 2}<record from="{from_record}" to="{to_record}"/>\n'
+
+    @staticmethod
+    def get_footer() -> str:
+        """Get the end of a config file, after the records."""
+        indent = variables.PROGRESS.config_format["indent"]
+        return f"{indent}</list>\n</record>"
+
     @property
     def config_images(self) -> set[str]:
         """Get all images that have a config record."""
@@ -29,31 +56,27 @@ class Config:
         """Get original string."""
         return self.__original_string
 
-    def __init__(self, directory: str) -> None:
+    def __init__(self, directory: str, archive=None, file_index=None) -> None:
         """Initialize object."""
         self.directory = directory
+        self.archive = archive  # The zip archive the config file is in, if any.
+        self.file_index = file_index  # Index of the files in the graphics location, used for suggestions.
+        self.size = None  # File size in bytes, if known.
         self.__original_string = None
         self.config_string = None
         self.booleans = {"preload": None, "amap": None}
         self.records = []
+        self.reached = False
         self.validated = False
 
     def __str__(self) -> str:
         """Get the config file as a string."""
-        indent = variables.PROGRESS.config_format["indent"]
-        string = "<record>\n"
-        boolean_values = {True: "true", False: "false", None: "none"}
-        for key, value in self.booleans.items():
-            if value is None:
-                continue
-            string += f'{indent}<boolean id="{key}" value="{boolean_values[value]}"/>\n'
-
-        string += f'{indent}<list id="maps">\n'
+        string = Config.get_header(self.booleans)
         record_list = sorted(self.records, key=lambda obj: (obj.from_record, obj.to_record))
         for record in record_list:
-            string += f'{indent * 2}<record from="{record.from_record}" to="{record.to_record}"/>\n'
+            string += Config.get_record_line(record.from_record, record.to_record)
 
-        string += f"{indent}</list>\n</record>"
+        string += Config.get_footer()
         return string
 
     def config_has_destination(self, to_record: str) -> bool:
@@ -83,8 +106,11 @@ class Config:
     def load(self) -> bool:
         """Load the config file."""
         try:
-            with open(self.directory, encoding="utf-8") as file:
-                self.__original_string = file.read()
+            if self.archive is not None:
+                self.__original_string = self.archive.read_text(self.directory)
+            else:
+                with open(self.directory, encoding="utf-8") as file:
+                    self.__original_string = file.read()
         except UnicodeDecodeError:
             logger.log("critical",
                        f"{self.directory}: Failed to load the config file. Make sure the file encoding is UTF-8.")
@@ -93,23 +119,45 @@ class Config:
         self.config_string = self.original_string
         return True
 
-    def save(self) -> None:
-        """Save the config file."""
+    def save(self) -> bool:
+        """Save the config file. Return False if the config file cannot be saved."""
+        if self.archive is not None:
+            logger.log("warning", f"{self.directory}: The config file is inside a zip archive, so the changes made to "
+                                  f"it cannot be saved.")
+            return False
+
         with open(self.directory, "w", encoding="utf-8") as file:
             file.write(self.config_string)
 
-    def validate(self, config_progress) -> None:
+        return True
+
+    def validate(self) -> None:
         """Validate a single config file."""
-        if not self.load():
+        if not self.read():
             return
+
+        self.validate_records(self.records)
+        self.finish()
+
+    def read(self) -> bool:
+        """Load and parse the config file. Return False if the config file cannot be validated."""
+        self.reached = True
+        if not self.load():
+            return False
         if not self.convert_bom():
-            return
-        if not self.parse(config_progress):
-            return
+            return False
+        if not self.parse():
+            return False
 
-        record_progress = 0
-        total_records = len(self.records)
-        index = 0
+        if self.file_index is not None:
+            self.file_index.add_config(self.directory, self.config_images)
+        return True
+
+    def validate_records(self, records: list[ConfigRecord]) -> None:
+        """Validate records of the config file. Records without an image may be deleted."""
+        status = variables.STATUS
+        results = batch.validate_records([record.from_record for record in records],
+                                         [record.to_record for record in records])
 
         flags = {
             "DELETE_RECORDS_WITH_MISSING_IMAGE": validator.has_flag("DELETE_RECORDS_WITH_MISSING_IMAGE",
@@ -118,25 +166,28 @@ class Config:
             "IGNORE_NON-MATCHING_IDS": validator.has_flag("IGNORE_NON-MATCHING_IDS", self.directory)
         }
 
-        while index < len(self.records):
-            record = self.records[index]
-            logger.print_progress(
-                    f"{config_progress} config files, {record_progress:,} / {total_records:,} records processed.")
-            if not record.validated:
-                index = record.validate(index, flags)
+        deleted_records = set()
+        for record, result in zip(records, results):
+            if not record.validate(flags, result):
+                deleted_records.add(id(record))
+            status.records_done += 1
 
-            record_progress += 1
+        if deleted_records:
+            self.records = [record for record in self.records if id(record) not in deleted_records]
+            if self.file_index is not None:
+                self.file_index.add_config(self.directory, self.config_images)
 
+    def finish(self) -> None:
+        """Save the changes made to the config file while validating it."""
         self.validated = True
         if validator.has_flag("REFORMAT_CONFIG_FILES", self.directory):
             self.config_string = str(self)
 
-        if self.original_string != self.config_string:
-            self.save()
+        if self.original_string != self.config_string and self.save():
             logger.log("info", f"{self.directory}: The changes made to the config file have been saved.")
         variables.PROGRESS.check_save()
 
-    def parse(self, config_progress: int) -> bool:
+    def parse(self) -> bool:
         """Parse a string of config."""
         string = Config.remove_comments(self.config_string)
 
@@ -153,45 +204,52 @@ class Config:
             "DELETE_DUPLICATE_RECORDS": validator.has_flag("DELETE_DUPLICATE_RECORDS", self.directory),
             "IGNORE_MULTI_USE_IMAGES": validator.has_flag("IGNORE_MULTI_USE_IMAGES", self.directory)
         }
-        record_progress = 0
-        while True:
-            logger.print_progress(f"{config_progress} config files, {record_progress:,} records parsed.")
-            string = string.strip()
-            if not string:
-                break
-
-            match = re.fullmatch(r'(?P<record><\s*record\s+from\s*=\s*"(?P<source>[^"]*)"\s+to\s*=\s*"(?P<destination>['
-                                 r'^"]*)"\s*/\s*>\s*)(?P<rest>.*)', string, re.DOTALL)
-
+        # The records, sources and destinations so far are kept in sets, so that finding the duplicates does not go
+        # through every record for each record. The string is matched from a position instead of being cut.
+        record_pattern = re.compile(r'(?P<record><\s*record\s+from\s*=\s*"(?P<source>[^"]*)"\s+to\s*=\s*"'
+                                    r'(?P<destination>[^"]*)"\s*/\s*>\s*)')
+        records = set()
+        sources = set()
+        destinations = set()
+        status = variables.STATUS
+        string = string.strip()
+        position = 0
+        while position < len(string):
+            match = record_pattern.match(string, position)
             if not match:
                 logger.log("critical", f"{self.directory}: Something wrong in record "
-                                       f"starting from:\n{logger.get_beginning_of_string(string, 100)}\n"
+                                       f"starting from:\n{logger.get_beginning_of_string(string[position:], 100)}\n"
                                        f"{logger.get_console_separator()}")
                 return False
 
-            if self.config_has_record(match.group("source"), match.group("destination")):
+            source = match.group("source")
+            destination = match.group("destination")
+            if (source, destination) in records:
                 if flags["DELETE_DUPLICATE_RECORDS"]:
                     self.config_string = self.config_string.replace(match.group("record"), "")
                     logger.log("info", f'{self.directory}: Record from="'
-                                       f'{match.group("source")}" to="{match.group("destination")}" already detected '
+                                       f'{source}" to="{destination}" already detected '
                                        f'in the config file. Deleted.')
                 else:
                     logger.log("warning", f'{self.directory}: Record from="'
-                                          f'{match.group("source")}" to="{match.group("destination")}" appears '
+                                          f'{source}" to="{destination}" appears '
                                           f'multiple times in the config file.')
 
             else:
-                if self.config_has_destination(match.group("destination")):
+                if destination in destinations:
                     logger.log("warning", f"{self.directory}: "
-                                          f"{match.group('destination')} appears multiple times in the config.")
+                                          f"{destination} appears multiple times in the config.")
 
-                if not flags["IGNORE_MULTI_USE_IMAGES"] and self.config_has_source(match.group("source")):
-                    logger.log("warning", f"{self.directory}: {match.group('source')} "
+                if not flags["IGNORE_MULTI_USE_IMAGES"] and source in sources:
+                    logger.log("warning", f"{self.directory}: {source} "
                                           f"is used multiple times in the config.")
 
-                self.records.append(ConfigRecord(self, match.group("source"), match.group("destination")))
-            string = match.group("rest")
-            record_progress += 1
+                self.records.append(ConfigRecord(self, source, destination))
+                records.add((source, destination))
+                sources.add(source)
+                destinations.add(destination)
+            position = match.end()
+            status.records_parsed += 1
 
         return True
 
@@ -207,9 +265,11 @@ class Config:
 
             return False
 
-        logger.log("info", f"{self.directory}: File encoding is UTF-8-BOM. Saving as UTF-8...")
         self.config_string = self.config_string[1:]
-        self.save()
+        # A config file inside a zip archive cannot be saved, which validate warns about once at the end.
+        if self.archive is None:
+            logger.log("info", f"{self.directory}: File encoding is UTF-8-BOM. Saving as UTF-8...")
+            self.save()
         return True
 
     def validate_record_element(self, string: str) -> str | None:
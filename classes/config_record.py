@@ -2,6 +2,7 @@
 import os.path
 import re
 
+import batch
 import logger
 import variables
 
@@ -20,7 +21,6 @@ class ConfigRecord:
         self.directory = os.path.dirname(self.config.directory)
         self.from_record = from_record
         self.to_record = to_record
-        self.destination_type = None
         self.validated = False
 
     def __eq__(self, other) -> bool:
@@ -30,93 +30,79 @@ class ConfigRecord:
 
         return (
                 self.directory == other.directory and self.from_record == other.from_record and self.to_record ==
-                other.to_record and self.destination_type == other.destination_type)
+                other.to_record)
 
-    def validate(self, index: int, flags: dict[str, bool]) -> int:
-        """Validate the record."""
+    def validate(self, flags: dict[str, bool], result: int) -> bool:
+        """Validate the record. The result is the record's result code from batch.validate_records.
+
+        Return False if the record was deleted from the config string, for the config to remove it from its records.
+        """
+        deleted = False
         files = self.get_amount_of_files()
         if files == 0:
             if flags["DELETE_RECORDS_WITH_MISSING_IMAGE"]:
-                self.delete_record(index)
+                self.delete_record()
                 logger.log("info",
                            f'{self.config.directory}: Record from="{self.from_record}" to="{self.to_record}" did not '
                            f'have an image file and has been deleted.')
-                index -= 1
+                deleted = True
 
             elif not flags["IGNORE_MISSING_IMAGES"]:
                 logger.log("warning",
                            f'{self.config.directory}: Record from="{self.from_record}" to="{self.to_record}" does not '
-                           f'have an image file.')
+                           f'have an image file.{self.get_suggestion_text()}')
         elif files > 1:
             logger.log("warning",
                        f'{self.config.directory}: Record from="{self.from_record}" to="{self.to_record} has {files} '
                        f'matching image files.')
 
-        if not self.validate_to_path():
+        if result & batch.INVALID_TO_PATH:
             logger.log("important",
                        f'{self.config.directory}: Record from="{self.from_record}" to="{self.to_record}" has an '
                        f'invalid to-path.')
 
-        elif not self.validate_destination_id():
+        elif result & batch.INVALID_DESTINATION_ID:
             logger.log("important",
                        f'{self.config.directory}: Record from="{self.from_record}" to="{self.to_record}" has an '
                        f'invalid ID in to-path.')
 
-        elif not flags["IGNORE_NON-MATCHING_IDS"] and not self.validate_image_id():
+        elif not flags["IGNORE_NON-MATCHING_IDS"] and result & batch.NON_MATCHING_IDS:
             logger.log("warning",
                        f'{self.config.directory}: Record from="{self.from_record}" to="{self.to_record}" has '
                        f'non-matching IDs in image file and destination.')
 
         self.validated = True
-        variables.PROGRESS.check_save()
-        return index + 1
+        return not deleted
 
-    def delete_record(self, index: int) -> None:
-        """Delete the record from config."""
+    def delete_record(self) -> None:
+        """Delete the record from the config string."""
         regex = r'<\s*record\s+from\s*=\s*"' + re.escape(self.from_record) + r'"\s+to\s*=\s*"' + re.escape(
                 self.to_record) + r'"\s*/\s*>\s*'
         self.config.config_string = re.sub(regex, "", self.config.config_string)
 
-        del self.config.records[index]
-
     def get_amount_of_files(self) -> int:
         """Get the amount of files the record points to. Should be 1."""
+        if self.config.archive is not None:
+            file_exists = self.config.archive.has_file
+        else:
+            file_exists = os.path.exists
+
         found_files = 0
+        path_without_extension = self.from_record_path
         for extension in variables.PROGRESS.image_file_extensions:
-            if os.path.exists(f"{self.from_record_path}.{extension}"):
+            if file_exists(f"{path_without_extension}.{extension}"):
                 found_files += 1
 
         return found_files
 
-    def validate_to_path(self) -> bool:
-        """Validate the to-path of a record."""
-        if self.to_record in variables.PROGRESS.valid_to_paths:
-            self.destination_type = self.to_record
-            return True
-
-        for path in variables.PROGRESS.valid_to_paths:
-            regex_path = path.replace("{id}", r"[^/]+")
-            if re.fullmatch(regex_path, self.to_record):
-                self.destination_type = path
-                return True
-
-        return False
-
-    def validate_destination_id(self) -> bool:
-        """Validate the ID of a to-path in record."""
-        self.destination_type = self.destination_type.replace("{id}", r"[0-9]+")
-        return bool(re.fullmatch(self.destination_type, self.to_record))
-
-    def validate_image_id(self) -> bool:
-        """Check the from-record, and if the image has number for a name, make sure it matches with the config ID."""
-        match = re.search(r"(?:^|/)(?P<id>\d+)$", self.from_record)
-        if not match:
-            return True
-        from_id = int(match.group("id"))
-
-        match = re.search(r"\D*(?P<id>\d+)\D*", self.to_record)
-        if not match:
-            return True
-        to_id = int(match.group("id"))
-
-        return from_id == to_id
+    def get_suggestion_text(self) -> str:
+        """Get suggestions for the image file of a record whose image is missing."""
+        if self.config.file_index is None:
+            return ""
+
+        suggestions = self.config.file_index.get_suggestions(self.from_record_path)
+        if not suggestions:
+            return ""
+
+        filenames = ", ".join(f'"{os.path.relpath(path, self.directory).replace(os.sep, "/")}"' for path in suggestions)
+        return f" Did you mean {filenames}?"
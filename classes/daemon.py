@@ -0,0 +1,399 @@
+"""Daemon class."""
+import contextlib
+import http.server
+import json
+import os
+import threading
+import time
+import urllib.parse
+
+import logger
+import scheduler
+import variables
+from classes import path
+from classes.file_index import FileIndex
+
+
+class Daemon:
+    """Validation daemon that keeps the graphics locations in memory and answers requests from a local HTTP API.
+
+    The findings are kept separately for every config file, non-config file and location, and for the records of every
+    image in a config file, so that a change only needs the affected ones to be validated again. A config file is only
+    parsed again when it changes itself. The destinations used in more than one config file are given as findings of
+    each of those config files. All requests share one lock, as validating uses the global progress.
+    """
+
+    def __init__(self) -> None:
+        """Initialize object."""
+        self.findings = {}  # Path of a config file, other file or location -> priority -> logged messages.
+        self.record_findings = {}  # Config file -> path of an image without extension -> priority -> logged messages.
+        self.config_records = {}  # Config file -> path of an image without extension -> records of the image.
+        self.flagged_images = {}  # Directory -> (config file, image) pairs whose records there have findings.
+        self.destinations = {}  # Destination -> config files that use it.
+        self.config_destinations = {}  # Config file -> destinations it uses.
+        self.shared_destinations = {}  # Config file -> destinations it shares with other config files.
+        self.lock = threading.RLock()
+
+    @contextlib.contextmanager
+    def capture(self, findings: dict | None = None):
+        """Capture what is logged inside the block, adding it to the given findings or to new ones."""
+        if findings is None:
+            findings = {}
+
+        variables.PROGRESS.log = {priority: "" for priority in variables.PROGRESS.log}
+        try:
+            yield findings
+        finally:
+            for priority, string in variables.PROGRESS.log.items():
+                if string:
+                    findings[priority] = findings.get(priority, "") + string
+            variables.PROGRESS.log = {priority: "" for priority in variables.PROGRESS.log}
+
+    def set_findings(self, key: str, findings: dict) -> None:
+        """Save the findings of a config file, other file or location."""
+        if findings:
+            self.findings[key] = findings
+        else:
+            self.findings.pop(key, None)
+
+    def set_record_findings(self, config_path: str, image: str, findings: dict) -> None:
+        """Save the findings of the records of an image in a config file."""
+        directory = os.path.dirname(image)
+        if findings:
+            self.record_findings.setdefault(config_path, {})[image] = findings
+            self.flagged_images.setdefault(directory, set()).add((config_path, image))
+            return
+
+        self.record_findings.get(config_path, {}).pop(image, None)
+        if not self.record_findings.get(config_path, True):
+            del self.record_findings[config_path]
+        self.flagged_images.get(directory, set()).discard((config_path, image))
+        if not self.flagged_images.get(directory, True):
+            del self.flagged_images[directory]
+
+    def set_destinations(self, config_path: str, destinations: set[str]) -> set[str]:
+        """Save the destinations that a config file uses. Return the config files whose shared destinations changed."""
+        old_destinations = self.config_destinations.pop(config_path, set())
+        if destinations:
+            self.config_destinations[config_path] = destinations
+
+        changed = set()
+        for destination in old_destinations ^ destinations:
+            config_paths = self.destinations.setdefault(destination, set())
+            if destination in destinations:
+                config_paths.add(config_path)
+            else:
+                config_paths.discard(config_path)
+
+            for other_path in config_paths | {config_path}:
+                shared_destinations = self.shared_destinations.setdefault(other_path, set())
+                if len(config_paths) > 1 and other_path in config_paths:
+                    shared_destinations.add(destination)
+                else:
+                    shared_destinations.discard(destination)
+                if not shared_destinations:
+                    del self.shared_destinations[other_path]
+            # Every config file that used the destination gets a different list of the config files that use it.
+            changed.update(config_paths | {config_path})
+
+            if not config_paths:
+                del self.destinations[destination]
+
+        return changed
+
+    def get_keys(self) -> set[str]:
+        """Get the config files, other files and locations that have findings."""
+        return set(self.findings) | set(self.record_findings) | set(self.shared_destinations)
+
+    def get_key_findings(self, key: str) -> dict:
+        """Get the findings of a config file, other file or location, including the findings of its records."""
+        findings = dict(self.findings.get(key, {}))
+        record_findings = self.record_findings.get(key, {})
+        for image in sorted(record_findings):
+            for priority, string in record_findings[image].items():
+                findings[priority] = findings.get(priority, "") + string
+
+        if key in self.shared_destinations:
+            with self.capture(findings):
+                variables.PROGRESS.log_shared_destinations(
+                        {destination: sorted(self.destinations[destination])
+                         for destination in self.shared_destinations[key]})
+
+        return findings
+
+    def forget(self, key: str) -> set[str]:
+        """Forget the findings of a config file, other file or location, and the records of a config file.
+
+        Return the config files whose shared destinations changed.
+        """
+        self.findings.pop(key, None)
+        for image in list(self.record_findings.get(key, {})):
+            self.set_record_findings(key, image, {})
+        self.config_records.pop(key, None)
+        return self.set_destinations(key, set())
+
+    def validate_config(self, config) -> set[str]:
+        """Validate a config file, keeping the findings of its records by image.
+
+        Return the config files whose shared destinations changed.
+        """
+        changed = self.forget(config.directory)
+        with self.capture() as findings:
+            readable = config.read()
+
+        if readable:
+            records = {}
+            for record in config.records:
+                records.setdefault(record.from_record_path, []).append(record)
+            for image, image_records in records.items():
+                self.validate_records(config, image, image_records)
+            with self.capture(findings):
+                config.finish()
+
+            # Records without an image may have been deleted.
+            self.config_records[config.directory] = {}
+            for record in config.records:
+                self.config_records[config.directory].setdefault(record.from_record_path, []).append(record)
+            changed.update(self.set_destinations(config.directory, {record.to_record for record in config.records}))
+
+        self.set_findings(config.directory, findings)
+        return changed
+
+    def validate_records(self, config, image: str, records: list) -> None:
+        """Validate the records of an image in a config file."""
+        with self.capture() as findings:
+            config.validate_records(records)
+        self.set_record_findings(config.directory, image, findings)
+
+    def revalidate_image(self, path_object, config_path: str, image: str) -> set[str]:
+        """Validate the records of an image in a config file again, after the files of its directory changed.
+
+        Return the config files whose shared destinations changed.
+        """
+        config = path_object.config_files[config_path]
+        record_count = len(config.records)
+        self.validate_records(config, image, self.config_records[config_path].get(image, []))
+
+        # A deleted record needs the config file to be saved, as in a full validation.
+        if len(config.records) < record_count:
+            return self.validate_config(path_object.add_file(config_path))
+
+        return set()
+
+    def check_file(self, path_object, filepath: str) -> None:
+        """Check a non-config file for anomalies."""
+        with self.capture() as findings:
+            path_object.check_anomaly_file(filepath)
+        self.set_findings(filepath, findings)
+
+    def process_location(self, path_object) -> set[str]:
+        """Find the files of a graphics location, and validate them all.
+
+        Return the config files whose shared destinations changed.
+        """
+        changed = set()
+        keys = self.get_keys() | set(self.config_records) | set(self.config_destinations)
+        for key in [key for key in keys if self.get_location(key) is path_object]:
+            changed.update(self.forget(key))
+
+        with self.capture() as findings:
+            path_object.find_files()
+        self.set_findings(path_object.name, findings)
+
+        configs = list(path_object.config_files.values())
+        work = sum(scheduler.get_config_cost(config) for config in configs)
+        variables.STATUS.start_stage("configs", len(configs), work)
+        for config in configs:
+            changed.update(self.validate_config(config))
+            variables.STATUS.configs_done += 1
+            variables.STATUS.work_done += scheduler.get_config_cost(config)
+        for filepath in sorted(path_object.other_files):
+            self.check_file(path_object, filepath)
+
+        return changed
+
+    def load(self) -> None:
+        """Validate every graphics location."""
+        with self.lock:
+            for path_object in variables.PROGRESS.paths.values():
+                logger.print_new(f"Loading {path_object.name}...")
+                self.process_location(path_object)
+
+            files = len(self.get_keys())
+            logger.print_new(f"{files:,} files with findings. Ready for requests.")
+
+    def resolve(self, filepath: str) -> tuple:
+        """Get the graphics location that the path is in, and the path in the form the location gives its files.
+
+        Relative paths are relative to the working directory. If the path is not in any graphics location, return None
+        and the absolute path.
+        """
+        absolute_path = os.path.abspath(filepath)
+        for path_object in variables.PROGRESS.paths.values():
+            location = os.path.abspath(path_object.name)
+            if absolute_path == location:
+                return path_object, path_object.name
+            if absolute_path.startswith(os.path.join(location, "")):
+                return path_object, os.path.join(path_object.name, os.path.relpath(absolute_path, location))
+
+        return None, absolute_path
+
+    def get_location(self, filepath: str):
+        """Get the graphics location that the path is in, or None."""
+        return self.resolve(filepath)[0]
+
+    def validate_paths(self, filepaths: list[str]) -> dict[str, dict]:
+        """Validate the changed files, and the config files and files affected by them. Return their findings."""
+        with self.lock:
+            findings = {}
+            changes = {}  # Location name -> changed paths in it.
+            for filepath in filepaths:
+                path_object, filepath = self.resolve(filepath)
+                if path_object is None:
+                    findings[filepath] = {"critical": f"{filepath}: The path is not in any graphics location.\n"}
+                else:
+                    changes.setdefault(path_object.name, set()).add(filepath)
+
+            changed = set()
+            for name, location_paths in changes.items():
+                changed.update(self.validate_location_paths(variables.PROGRESS.paths[name], location_paths))
+
+            for key in sorted(changed):
+                findings[key] = self.get_key_findings(key)
+
+            return findings
+
+    def validate_location_paths(self, path_object, filepaths: set[str]) -> set[str]:
+        """Validate the changed files of a location, and the files affected by them.
+
+        Every change is applied to the location before anything is validated, so the result does not depend on the
+        order of the paths. Return the keys of the findings that were validated again.
+        """
+        # Changes inside zip archives can only be seen by going through the whole archive again.
+        if path_object.name in filepaths or path_object.archive is not None:
+            path_object = path.Path(path_object.name)
+            variables.PROGRESS.paths[path_object.name] = path_object
+            changed = self.process_location(path_object)
+            return {key for key in self.get_keys() if self.get_location(key) is path_object} | changed | filepaths
+
+        changed = set(filepaths)
+        config_paths = set()
+        images = set()  # Paths without extension of the changed non-config files.
+        old_images = set()
+        for filepath in filepaths:
+            filename = os.path.basename(filepath)
+            if filename == "config.xml":
+                config_paths.add(filepath)
+                if filepath in path_object.config_files:
+                    old_images.update(path_object.config_files[filepath].config_images)
+            elif filename not in variables.PROGRESS.ignored_file_names:
+                images.add(os.path.splitext(filepath)[0])
+
+            path_object.remove_file(filepath)
+            changed.update(self.forget(filepath))
+            if os.path.isfile(filepath):
+                path_object.add_file(filepath)
+
+        new_images = set()
+        for config_path in sorted(config_paths):
+            if config_path in path_object.config_files:
+                config = path_object.config_files[config_path]
+                changed.update(self.validate_config(config))
+                new_images.update(config.config_images)
+
+        # The records of the changed files in the other config files, and the records with findings that the changed
+        # files may be suggested for.
+        image_records = set()
+        for image in images:
+            image_records.update((config_path, image) for config_path in path_object.file_index.get_configs(image))
+            for config_path, flagged_image in self.flagged_images.get(os.path.dirname(image), set()):
+                if FileIndex.may_suggest(flagged_image, image):
+                    image_records.add((config_path, flagged_image))
+        for config_path, image in sorted(image_records):
+            if config_path not in config_paths and config_path in path_object.config_files:
+                changed.update(self.revalidate_image(path_object, config_path, image))
+                changed.add(config_path)
+
+        # The changed files, and the files whose record may have changed.
+        anomaly_paths = {filepath for filepath in filepaths if filepath in path_object.other_files}
+        for image in old_images ^ new_images:
+            anomaly_paths.update(path_object.file_index.get_files(image))
+        for filepath in sorted(anomaly_paths):
+            if filepath in path_object.other_files:
+                self.check_file(path_object, filepath)
+                changed.add(filepath)
+
+        return changed
+
+    def get_findings(self, filepath: str | None = None) -> dict[str, dict]:
+        """Get the findings of a file, or of every file if no file is given."""
+        with self.lock:
+            if filepath is None:
+                return {key: self.get_key_findings(key) for key in sorted(self.get_keys())}
+
+            filepath = self.resolve(filepath)[1]
+            return {filepath: self.get_key_findings(filepath)}
+
+    def serve(self, port: int) -> None:
+        """Answer requests on the port of localhost until interrupted."""
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", port), RequestHandler)
+        server.validation_daemon = self
+        logger.print_new(f"Listening on http://127.0.0.1:{port}.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+class RequestHandler(http.server.BaseHTTPRequestHandler):
+    """Handler of the daemon's HTTP requests.
+
+    GET /findings?path=<file> returns the findings of a file, or of every file if no path is given.
+    POST /validate with {"paths": [<file>, ...]} validates the changed files and returns the findings they affected.
+    """
+
+    def do_GET(self) -> None:
+        """Answer a GET request."""
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != "/findings":
+            self.send_json(404, {"error": f"Unknown endpoint {url.path}."})
+            return
+
+        query = urllib.parse.parse_qs(url.query)
+        filepath = query["path"][0] if "path" in query else None
+        self.send_json(200, {"findings": self.server.validation_daemon.get_findings(filepath)})
+
+    def do_POST(self) -> None:
+        """Answer a POST request."""
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != "/validate":
+            self.send_json(404, {"error": f"Unknown endpoint {url.path}."})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            filepaths = json.loads(self.rfile.read(length))["paths"]
+            if not isinstance(filepaths, list) or not all(isinstance(filepath, str) for filepath in filepaths):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            self.send_json(400, {"error": 'The request body must be JSON of the form {"paths": ["...", ...]}.'})
+            return
+
+        started = time.monotonic()
+        findings = self.server.validation_daemon.validate_paths(filepaths)
+        self.send_json(200, {"findings": findings, "seconds": round(time.monotonic() - started, 6)})
+
+    def send_json(self, status: int, data: dict) -> None:
+        """Send a JSON response."""
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        """Do not print every request to the console."""
+        return
@@ -0,0 +1,160 @@
+"""FileIndex class."""
+import os
+
+
+class FileIndex:
+    """Index of the file names in each directory of a graphics location.
+
+    Used for suggesting the intended image of a record whose image is missing. The file names are indexed by their
+    case-folded stem, so every suggestion is a dictionary lookup instead of a comparison against every file. The images
+    that the validated config files have records for are indexed too, for finding the config files of an image.
+    Directories are normalised, so a location given with a trailing separator is indexed the same as one without.
+    """
+
+    @staticmethod
+    def get_deletions(string: str) -> set[str]:
+        """Get the strings that have one character deleted from the string."""
+        return {string[:i] + string[i + 1:] for i in range(len(string))}
+
+    @staticmethod
+    def is_one_typo_away(string: str, other: str) -> bool:
+        """Check if the strings differ by one deleted, added, changed or swapped character."""
+        if len(string) > len(other):
+            string, other = other, string
+        if len(other) - len(string) > 1:
+            return False
+
+        i = 0
+        while i < len(string) and string[i] == other[i]:
+            i += 1
+
+        if len(string) < len(other):
+            return string[i:] == other[i + 1:]
+        if i == len(string):
+            return False
+        if string[i + 1:] == other[i + 1:]:
+            return True
+
+        return (i + 1 < len(string) and string[i] == other[i + 1] and string[i + 1] == other[i]
+                and string[i + 2:] == other[i + 2:])
+
+    @staticmethod
+    def may_suggest(path_without_extension: str, other_path: str) -> bool:
+        """Check if a file may be suggested for a missing image path, given the file's path without the extension."""
+        directory, stem = os.path.split(os.path.normpath(path_without_extension))
+        other_directory, other_stem = os.path.split(os.path.normpath(other_path))
+        if directory != other_directory:
+            return False
+
+        stem = stem.casefold()
+        other_stem = other_stem.casefold()
+        if other_stem in (stem, os.path.splitext(stem)[0]):
+            return True
+
+        return stem.isdigit() and other_stem.isdigit() and FileIndex.is_one_typo_away(stem, other_stem)
+
+    def __init__(self) -> None:
+        """Initialize object."""
+        self.directories = {}  # Directory -> case-folded stem -> file names.
+        self.deletions = {}  # Directory -> numeric stem with one digit deleted -> numeric stems. Built when needed.
+        self.config_images = {}  # Config file -> paths without extension of its records.
+        self.records = {}  # Path without extension -> config files that have a record for it.
+
+    def add(self, directory: str, filename: str) -> None:
+        """Add a file to the index."""
+        directory = os.path.normpath(directory)
+        stem = os.path.splitext(filename)[0].casefold()
+        filenames = self.directories.setdefault(directory, {}).setdefault(stem, [])
+        if filename not in filenames:
+            filenames.append(filename)
+            if len(filenames) == 1 and stem.isdigit() and directory in self.deletions:
+                for deletion in FileIndex.get_deletions(stem):
+                    self.deletions[directory].setdefault(deletion, set()).add(stem)
+
+    def remove(self, directory: str, filename: str) -> None:
+        """Remove a file from the index."""
+        directory = os.path.normpath(directory)
+        stem = os.path.splitext(filename)[0].casefold()
+        filenames = self.directories.get(directory, {}).get(stem, [])
+        if filename in filenames:
+            filenames.remove(filename)
+            if not filenames:
+                del self.directories[directory][stem]
+                if stem.isdigit() and directory in self.deletions:
+                    for deletion in FileIndex.get_deletions(stem):
+                        self.deletions[directory][deletion].discard(stem)
+
+    def get_files(self, path_without_extension: str) -> list[str]:
+        """Get the paths of the files that have exactly the given path without the extension."""
+        directory, stem = os.path.split(os.path.normpath(path_without_extension))
+        filenames = self.directories.get(directory, {}).get(stem.casefold(), [])
+        return [os.path.join(directory, filename) for filename in filenames if os.path.splitext(filename)[0] == stem]
+
+    def get_suggestions(self, path_without_extension: str, limit: int = 5) -> list[str]:
+        """Get the paths of the files that a missing image path most likely meant.
+
+        In order of preference: the same name in a different case or with a different extension, and then for numeric
+        names, the numbers that are one typo away.
+        """
+        path_without_extension = os.path.normpath(path_without_extension)
+        directory, stem = os.path.split(path_without_extension)
+        stems = self.directories.get(directory)
+        if not stems:
+            return []
+
+        stem = stem.casefold()
+        filenames = list(stems.get(stem, []))
+
+        # The record may include the file extension.
+        base, extension = os.path.splitext(stem)
+        if extension and base in stems:
+            filenames.extend(stems[base])
+
+        if not filenames and stem.isdigit():
+            for similar_stem in self.get_similar_numeric_stems(directory, stem):
+                filenames.extend(stems[similar_stem])
+
+        return [os.path.join(directory, filename) for filename in sorted(filenames)[:limit]]
+
+    def add_config(self, config_directory: str, images: set[str]) -> None:
+        """Add the images that a config file has records for, replacing the ones it had before."""
+        self.remove_config(config_directory)
+        self.config_images[config_directory] = set(images)
+        for image in images:
+            self.records.setdefault(image, set()).add(config_directory)
+
+    def remove_config(self, config_directory: str) -> None:
+        """Remove the images that a config file has records for."""
+        for image in self.config_images.pop(config_directory, set()):
+            self.records[image].discard(config_directory)
+            if not self.records[image]:
+                del self.records[image]
+
+    def get_configs(self, path_without_extension: str) -> list[str]:
+        """Get the config files that have a record for the path."""
+        return sorted(self.records.get(os.path.normpath(path_without_extension), set()))
+
+    def get_similar_numeric_stems(self, directory: str, stem: str) -> list[str]:
+        """Get the numeric stems in the directory that are one typo away from the stem.
+
+        Two strings one typo apart always share a string with one character deleted, or one of them is such a string of
+        the other. Indexing the deletions lets the lookup skip the files that are not similar at all.
+        """
+        if directory not in self.deletions:
+            deletions = {}
+            for existing_stem in self.directories[directory]:
+                if existing_stem.isdigit():
+                    for deletion in FileIndex.get_deletions(existing_stem):
+                        deletions.setdefault(deletion, set()).add(existing_stem)
+            self.deletions[directory] = deletions
+
+        deletions = self.deletions[directory]
+        stems = self.directories[directory]
+        candidates = set(deletions.get(stem, ()))
+        for deletion in FileIndex.get_deletions(stem):
+            candidates.update(deletions.get(deletion, ()))
+            if deletion and deletion in stems:
+                candidates.add(deletion)
+
+        candidates.discard(stem)
+        return sorted(candidate for candidate in candidates if FileIndex.is_one_typo_away(stem, candidate))
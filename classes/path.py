@@ -2,9 +2,13 @@
 import os
 
 import logger
+import scheduler
+import shard
 import validator
 import variables
+from classes.archive import Archive
 from classes.config import Config
+from classes.file_index import FileIndex
 
 
 class Path:
@@ -25,11 +29,15 @@ class Path:
     def __init__(self, name: str) -> None:
         """Initialize object."""
         self.name = name
+        self.archive = None if os.path.isdir(name) else Archive(name)
         self.config_files = {}
         self.other_files = set()
+        self.file_index = FileIndex()
         self.files_found = False
         self.configs_validated = False
         self.anomaly_files_identified = False
+        self.anomaly_files_checked = 0  # How many of the sorted other files have been checked, for resuming.
+        self.unrecorded_images = []  # Images without a record in this shard, checked again when merging.
 
         self.__config_images = None
 
@@ -44,6 +52,8 @@ class Path:
 
         if not self.configs_validated:
             self.validate_configs()
+        if not self.configs_validated:
+            return
         config_count = len(self.config_files.keys())
         logger.print_new(f"{config_count:,} / {config_count:,} config files processed...")
 
@@ -52,33 +62,70 @@ class Path:
 
     def find_files(self) -> None:
         """Find all files within the path."""
-        for root, _, files in os.walk(self.name):
+        status = variables.STATUS
+        status.start_stage("search")
+        if self.archive is not None:
+            self.find_archive_files()
+            return
+
+        for root, files in walk(self.name):
             for filename in files:
-                if filename in variables.PROGRESS.ignored_file_names:
-                    continue
+                self.file_index.add(root, filename)
 
-                logger.print_progress(
-                        f"{len(self.config_files.keys()):,} config files and {len(self.other_files):,} other files "
-                        f"found.")
+            if not shard.in_shard(root, self.name):
+                continue
 
+            for filename in files:
                 filepath = os.path.join(root, filename)
                 if filename == "config.xml":
-                    self.config_files[filepath] = Config(filepath)
+                    self.config_files[filepath] = Config(filepath, file_index=self.file_index)
+                    status.configs_found += 1
                 else:
                     self.other_files.add(filepath)
+                    status.other_files_found += 1
+
+        self.files_found = True
+        variables.PROGRESS.check_save()
+
+    def find_archive_files(self) -> None:
+        """Find all files within the zip archive of the path."""
+        status = variables.STATUS
+        for member in self.archive.get_members():
+            filename = member.filename.rsplit("/", 1)[-1]
+            if filename in variables.PROGRESS.ignored_file_names:
+                continue
+
+            filepath = self.archive.get_path(member)
+            self.archive.files.add(filepath)
+            self.file_index.add(os.path.dirname(filepath), filename)
+            if not shard.in_shard(os.path.dirname(filepath), self.name):
+                continue
+
+            if filename == "config.xml":
+                self.config_files[filepath] = Config(filepath, self.archive, self.file_index)
+                self.config_files[filepath].size = member.file_size
+                status.configs_found += 1
+            else:
+                self.other_files.add(filepath)
+                status.other_files_found += 1
 
         self.files_found = True
         variables.PROGRESS.check_save()
 
     def validate_configs(self) -> None:
         """Validate the config files inside the path."""
-        config_files = len(self.config_files.keys())
-        config_progress = 0
-        for config in self.config_files.values():
-            logger.print_progress(f"{config_progress:,} / {config_files:,} config files processed...")
+        status = variables.STATUS
+        configs = scheduler.order_configs(self.config_files.values())
+        # The ETA is estimated from the costs, as the largest config files are validated first.
+        work = sum(scheduler.get_config_cost(config) for config in configs if not config.validated)
+        status.start_stage("configs", len(configs), work)
+        for config in configs:
             if not config.validated:
-                config.validate(f"{config_progress} / {config_files}")
-            config_progress += 1
+                if scheduler.out_of_time():
+                    return
+                config.validate()
+                status.work_done += scheduler.get_config_cost(config)
+            status.configs_done += 1
 
         self.configs_validated = True
         variables.PROGRESS.check_save()
@@ -86,18 +133,96 @@ class Path:
     def find_anomaly_files(self) -> None:
         """Find files that are not images or are not in config data."""
         filelist = sorted(list(self.other_files))
-        for filepath in filelist:
-            if not variables.PROGRESS.is_image_file(filepath):
-                if not validator.has_flag("IGNORE_NON-IMAGE_FILES", filepath):
-                    logger.log("warning", f"{filepath}: The file is not a recognised image.")
-
-            elif not validator.has_flag("IGNORE_MISSING_RECORDS", filepath) and not self.has_file_record(filepath):
-                logger.log("warning", f"{filepath}: No config record exists for the file.")
+        status = variables.STATUS
+        status.start_stage("anomalies", len(filelist), len(filelist) - self.anomaly_files_checked)
+        status.files_checked = self.anomaly_files_checked
+        for filepath in filelist[self.anomaly_files_checked:]:
+            if scheduler.out_of_time():
+                return
+            self.check_anomaly_file(filepath)
+            self.anomaly_files_checked += 1
+            status.files_checked += 1
+            status.work_done += 1
 
         self.anomaly_files_identified = True
         variables.PROGRESS.check_save()
 
+    def check_anomaly_file(self, filepath: str) -> None:
+        """Check if a file is not an image or is not in config data."""
+        if not variables.PROGRESS.is_image_file(filepath):
+            if not validator.has_flag("IGNORE_NON-IMAGE_FILES", filepath):
+                logger.log("warning", f"{filepath}: The file is not a recognised image.")
+
+        elif not validator.has_flag("IGNORE_MISSING_RECORDS", filepath) and not self.has_file_record(filepath):
+            # The record may be in a config file of another shard.
+            if variables.SHARD is not None:
+                self.unrecorded_images.append(filepath)
+            else:
+                logger.log("warning", f"{filepath}: No config record exists for the file.")
+
     def has_file_record(self, filepath: str) -> bool:
         """Check if the file has a config record."""
         path_without_extension = os.path.splitext(filepath)[0]
         return path_without_extension in self.config_images
+
+    def add_file(self, filepath: str) -> Config | None:
+        """Add a file that has appeared after the search. Return the config object if the file is a config file."""
+        directory, filename = os.path.split(filepath)
+        if filename in variables.PROGRESS.ignored_file_names:
+            return None
+
+        self.file_index.add(directory, filename)
+        self.__config_images = None
+        if filename == "config.xml":
+            self.config_files[filepath] = Config(filepath, file_index=self.file_index)
+            return self.config_files[filepath]
+
+        self.other_files.add(filepath)
+        return None
+
+    def remove_file(self, filepath: str) -> None:
+        """Remove a file that has changed or disappeared after the search."""
+        if filepath not in self.config_files and filepath not in self.other_files:
+            return
+
+        directory, filename = os.path.split(filepath)
+        self.file_index.remove(directory, filename)
+        self.file_index.remove_config(filepath)
+        self.__config_images = None
+        self.config_files.pop(filepath, None)
+        self.other_files.discard(filepath)
+
+
+def walk(directory: str):
+    """Go through a directory and its sub-directories in the order the from-records of their files are sorted in.
+
+    Yield each directory with its file names, leaving out ignored file names. A sub-directory is sorted by its name
+    followed by a "/", so a directory is yielded in parts when its sub-directories are sorted between its files.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            entries = list(entries)
+    except OSError:
+        return  # Like os.walk, directories that cannot be read are skipped.
+
+    items = []
+    for entry in entries:
+        if entry.is_dir():
+            if not entry.is_symlink():
+                items.append((f"{entry.name}/", entry.name, True))
+        elif entry.name not in variables.PROGRESS.ignored_file_names:
+            items.append((os.path.splitext(entry.name)[0], entry.name, False))
+
+    filenames = []
+    for _, name, is_directory in sorted(items):
+        if not is_directory:
+            filenames.append(name)
+            continue
+
+        if filenames:
+            yield directory, filenames
+            filenames = []
+        yield from walk(os.path.join(directory, name))
+
+    if filenames:
+        yield directory, filenames
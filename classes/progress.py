@@ -4,9 +4,12 @@ import json
 import os
 import pickle
 import shutil
+import zipfile
 from pathlib import Path
 
 import logger
+import scheduler
+import variables
 from classes import path
 from load import loader
 
@@ -14,15 +17,24 @@ from load import loader
 class Progress:
     """Progress class."""
 
+    @staticmethod
+    def get_directory() -> str:
+        """Get the directory of the saved progress. Each shard has its own, as the shards may run side by side."""
+        if variables.SHARD is None:
+            return "progress"
+
+        return f"progress-shard-{variables.SHARD[0]}-of-{variables.SHARD[1]}"
+
     @staticmethod
     def delete_progress() -> None:
         """Delete the saved progress."""
-        shutil.rmtree("progress", ignore_errors=True)
+        shutil.rmtree(Progress.get_directory(), ignore_errors=True)
 
     @staticmethod
     def get_file_data() -> list[dict]:
         """Get the data of the saved progress files."""
-        files = [{"name": "progress/1.pcl", "modified": 0.0}, {"name": "progress/2.pcl", "modified": 0.0}]
+        directory = Progress.get_directory()
+        files = [{"name": f"{directory}/1.pcl", "modified": 0.0}, {"name": f"{directory}/2.pcl", "modified": 0.0}]
         for file in files:
             if os.path.exists(file["name"]):
                 file["modified"] = os.path.getmtime(file["name"])
@@ -42,8 +54,8 @@ class Progress:
             if not path_string:
                 continue
 
-            if not os.path.isdir(path_string):
-                logger.log("info", f"{path_string} is not an existing directory and will be ignored.")
+            if not os.path.isdir(path_string) and not zipfile.is_zipfile(path_string):
+                logger.log("info", f"{path_string} is not an existing directory or zip archive and will be ignored.")
             else:
                 paths[path_string] = path.Path(path_string)
 
@@ -115,10 +127,37 @@ class Progress:
 
     def process_graphics_locations(self) -> None:
         """Go through the graphics locations."""
-        for path_object in self.paths.values():
+        for path_object in scheduler.order_paths(self.paths.values()):
+            if scheduler.out_of_time():
+                return
             if not path_object.anomaly_files_identified:
                 path_object.process()
 
+    @staticmethod
+    def log_shared_destinations(destinations: dict[str, list[str]]) -> None:
+        """Log the destinations that are used in more than one config file."""
+        for to_record in sorted(destinations):
+            config_directories = destinations[to_record]
+            if len(config_directories) > 1:
+                config_list = "\n".join(sorted(config_directories))
+                logger.log("warning", f"{to_record}: The destination is used in {len(config_directories)} config "
+                                      f"files:\n{config_list}")
+
+    def get_destinations(self) -> dict[str, list[str]]:
+        """Get the config files that use each destination."""
+        destinations = {}
+        for path_object in self.paths.values():
+            for config in path_object.config_files.values():
+                for to_record in {record.to_record for record in config.records}:
+                    destinations.setdefault(to_record, []).append(config.directory)
+
+        return destinations
+
+    @property
+    def finished(self) -> bool:
+        """Check if every graphics location has been processed."""
+        return all(path_object.anomaly_files_identified for path_object in self.paths.values())
+
     def is_image_file(self, filepath) -> bool:
         """Return true if the filepath has a recognised image file type. Otherwise, return False."""
         file_ext = os.path.splitext(filepath)[1].casefold()[1:]
@@ -140,7 +179,7 @@ class Progress:
         """Save the progress."""
         files = Progress.get_file_data()
         files.sort(key=lambda f: f["modified"])
-        os.makedirs("progress", exist_ok=True)
+        os.makedirs(Progress.get_directory(), exist_ok=True)
         with open(files[0]["name"], "wb") as file:
             pickle.dump(self, file)
 
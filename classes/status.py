@@ -0,0 +1,119 @@
+"""Status class."""
+import datetime
+import threading
+import time
+
+import logger
+
+
+class Status:
+    """Progress counters of the run, shown on the console by a background thread.
+
+    The loops that go through files and records only increment the counters. Formatting and printing the status line is
+    left to the thread, which does it once per interval.
+    """
+
+    @staticmethod
+    def format_rate(amount: int, seconds: float, unit: str) -> str:
+        """Get the rate of a counter as a string."""
+        if seconds <= 0:
+            return f"0 {unit}/s"
+
+        return f"{amount / seconds:,.0f} {unit}/s"
+
+    @staticmethod
+    def format_eta(done: int, total: int, seconds: float) -> str:
+        """Get the estimated time left as a string."""
+        if done <= 0:
+            return "ETA unknown"
+
+        remaining = max(total - done, 0)
+        return f"ETA {datetime.timedelta(seconds=round(seconds / done * remaining))}"
+
+    def __init__(self, interval: float) -> None:
+        """Initialize object."""
+        self.interval = interval
+        self.stage = None
+        self.stage_started = 0.0
+
+        # Searching for files.
+        self.configs_found = 0
+        self.other_files_found = 0
+
+        # Parsing and validating config files.
+        self.configs_done = 0
+        self.configs_total = 0
+        self.records_parsed = 0
+        self.records_done = 0
+
+        # Looking for anomaly files.
+        self.files_checked = 0
+        self.files_total = 0
+
+        # Estimated work of the stage, for the ETA. Counts only the work left when the stage started, so a resumed stage
+        # is not estimated from the work done before it.
+        self.work_done = 0
+        self.work_total = 0
+
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+    def __str__(self) -> str:
+        """Get the status line."""
+        seconds = time.monotonic() - self.stage_started
+        if self.stage == "search":
+            files_found = self.configs_found + self.other_files_found
+            return (f"{self.configs_found:,} config files and {self.other_files_found:,} other files found. "
+                    f"{Status.format_rate(files_found, seconds, 'files')}")
+
+        if self.stage == "configs":
+            return (f"{self.configs_done:,} / {self.configs_total:,} config files processed, "
+                    f"{self.records_parsed:,} records parsed, {self.records_done:,} records validated. "
+                    f"{Status.format_rate(self.records_parsed, seconds, 'parsed')}, "
+                    f"{Status.format_rate(self.records_done, seconds, 'validated')}, "
+                    f"{Status.format_eta(self.work_done, self.work_total, seconds)}")
+
+        if self.stage == "anomalies":
+            return (f"{self.files_checked:,} / {self.files_total:,} files checked for anomalies. "
+                    f"{Status.format_rate(self.work_done, seconds, 'files')}, "
+                    f"{Status.format_eta(self.work_done, self.work_total, seconds)}")
+
+        return ""
+
+    def start_stage(self, stage: str, total: int = 0, work: int = 0) -> None:
+        """Reset the counters for a new stage of the run. The work is the estimated work left in the stage."""
+        self.configs_found = 0
+        self.other_files_found = 0
+        self.configs_done = 0
+        self.configs_total = total
+        self.records_parsed = 0
+        self.records_done = 0
+        self.files_checked = 0
+        self.files_total = total
+        self.work_done = 0
+        self.work_total = work
+
+        self.stage_started = time.monotonic()
+        self.stage = stage
+
+    def start(self) -> None:
+        """Start showing the status line."""
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.run, name="status", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stop showing the status line."""
+        if self.__thread is None:
+            return
+
+        self.__stop_event.set()
+        self.__thread.join()
+        self.__thread = None
+
+    def run(self) -> None:
+        """Print the status line until stopped."""
+        while not self.__stop_event.wait(self.interval):
+            message = str(self)
+            if message:
+                logger.print_progress(message)
@@ -0,0 +1,71 @@
+"""Functions for generating config files for folders of images."""
+import os
+
+import logger
+import variables
+from classes import path
+from classes.config import Config
+
+
+def validate_template(template: str) -> None:
+    """Make sure that the to-path template can be used for generating records."""
+    if template not in variables.PROGRESS.valid_to_paths:
+        raise ValueError(f"{template} is not listed in valid_to_paths.txt.")
+    if "{id}" not in template:
+        raise ValueError(f"{template} does not have an {{id}} to fill in.")
+
+
+def get_image_ids(directory: str, filenames: list[str]) -> list[tuple[str, str, int]]:
+    """Get the stems, file names and IDs of the numerically named images in a directory, in the order of the stems."""
+    stems = {}
+    for filename in filenames:
+        if not variables.PROGRESS.is_image_file(filename):
+            continue
+
+        stem = os.path.splitext(filename)[0]
+        if not stem.isdigit():
+            logger.log("info", f"{os.path.join(directory, filename)}: The file name is not a number. Skipped.")
+        elif stem in stems:
+            logger.log("warning", f"{os.path.join(directory, filename)}: Another image file has the same name. "
+                                  f"Skipped.")
+        else:
+            stems[stem] = filename
+
+    return [(stem, stems[stem], int(stem)) for stem in sorted(stems)]
+
+
+def generate(folder: str, template: str, output: str | None = None, overwrite: bool = False) -> None:
+    """Generate a config file for the images in a folder and its sub-folders.
+
+    The records are written as the folder is walked, so the memory used does not grow with the amount of images. They
+    are written in the order Config sorts them in, so reformatting the config file does not move them.
+    """
+    validate_template(template)
+    if output is None:
+        output = os.path.join(folder, "config.xml")
+    if os.path.exists(output) and not overwrite:
+        raise FileExistsError(f"{output} already exists.")
+    config_directory = os.path.dirname(os.path.abspath(output))
+
+    used_ids = set()
+    records = 0
+    temporary_file = f"{output}.tmp"
+    with open(temporary_file, "w", encoding="utf-8") as file:
+        file.write(Config.get_header({"preload": False, "amap": False}))
+        for root, filenames in path.walk(folder):
+            directory = os.path.relpath(os.path.abspath(root), config_directory).replace(os.sep, "/")
+            for stem, filename, image_id in get_image_ids(root, filenames):
+                if image_id in used_ids:
+                    logger.log("warning", f"{os.path.join(root, filename)}: An image with the ID {image_id} has "
+                                          f"already been given a record. Skipped.")
+                    continue
+
+                used_ids.add(image_id)
+                from_record = stem if directory == "." else f"{directory}/{stem}"
+                file.write(Config.get_record_line(from_record, template.replace("{id}", str(image_id))))
+                records += 1
+
+        file.write(Config.get_footer())
+
+    os.replace(temporary_file, output)
+    logger.print_new(f"{output}: Config file with {records:,} records generated.")
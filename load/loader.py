@@ -1,6 +1,7 @@
 """Functions for loading user settings."""
 import os.path
 import re
+import zipfile
 
 import variables
 
@@ -27,7 +28,7 @@ def load_flags() -> None:
             variables.FLAGS[current_directory].add(line)
 
         if line not in variables.VALID_FLAGS:
-            if os.path.isdir(line):
+            if os.path.isdir(line) or zipfile.is_zipfile(line):
                 current_directory = line
                 variables.FLAGS[line] = set()
             else:
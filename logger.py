@@ -1,8 +1,11 @@
 """Functions related to logging info."""
-import time
+import threading
 
 import variables
 
+# The status line is printed from a background thread, so prints must not interleave.
+PRINT_LOCK = threading.Lock()
+
 
 def get_beginning_of_string(string: str, chars: int) -> str:
     """Get the beginning of a string, up to given number of characters."""
@@ -29,17 +32,15 @@ def add_whitespace_to_print(message: str) -> str:
 
 def print_new(message: str) -> None:
     """Print a message to a new line."""
-    print(add_whitespace_to_print(message))
-    variables.CONSOLE_LINE_LENGTH = 0
+    with PRINT_LOCK:
+        print(add_whitespace_to_print(message))
+        variables.CONSOLE_LINE_LENGTH = 0
 
 
 def print_progress(message: str) -> None:
-    """Check if an update should be printed."""
-    now = time.time()
-
-    if variables.NEXT_UPDATE <= now:
-        variables.NEXT_UPDATE = now + variables.PRINT_UPDATE_INTERVAL
-        print(add_whitespace_to_print(message), end="\r")
+    """Print a progress message over the previous one."""
+    with PRINT_LOCK:
+        print(add_whitespace_to_print(message), end="\r", flush=True)
         variables.CONSOLE_LINE_LENGTH = len(message)
 
 
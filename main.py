@@ -1,16 +1,120 @@
 """The launcher file."""
+import argparse
+import time
+
+import generator
+import logger
+import scheduler
+import shard
 import variables
+from classes.daemon import Daemon
+from classes.progress import Progress
+from classes.status import Status
 from load import loader, progress
 
 
+def parse_arguments() -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Validate Football Manager graphics config files.")
+    parser.add_argument("command", nargs="?", choices=("validate", "merge", "generate", "daemon"), default="validate",
+                        help="validate the graphics locations (default), merge the partial results of shards, "
+                             "generate a config file for a folder of images, or keep validating changes as a daemon")
+    parser.add_argument("folder", nargs="?", help="folder of images to generate a config file for")
+    parser.add_argument("--template", help="destination of the generated records, from valid_to_paths.txt")
+    parser.add_argument("--output", help="where to save the generated config file, by default the folder's config.xml")
+    parser.add_argument("--overwrite", action="store_true", help="replace the generated config file if it exists")
+    parser.add_argument("--shard", type=shard.parse_shard, metavar="i/N",
+                        help="only validate shard i of N, and save a partial result for merging")
+    parser.add_argument("--run-id", type=shard.parse_run_id,
+                        help="ID shared by the shards of one run, and given to merge to choose the run to merge")
+    parser.add_argument("--time-budget", type=float, metavar="SECONDS",
+                        help="stop after the given time, saving a partial log and the progress for resuming. "
+                             "Checked between files, so the search for files may go over it")
+    parser.add_argument("--port", type=int, default=8765, help="localhost port of the daemon (default: 8765)")
+    parser.add_argument("--quiet", action="store_true", help="do not show the status line while validating")
+
+    arguments = parser.parse_args()
+    if arguments.shard is not None and arguments.run_id is None:
+        parser.error("--shard needs a --run-id, shared by every shard of the run")
+    if arguments.command == "generate" and (arguments.folder is None or arguments.template is None):
+        parser.error("generate needs a folder and a --template")
+
+    return arguments
+
+
 def run() -> None:
     """Run the program."""
+    arguments = parse_arguments()
+    if arguments.command == "merge":
+        merge(arguments.run_id)
+        return
+    if arguments.command == "generate":
+        generate(arguments)
+        return
+    if arguments.command == "daemon":
+        run_daemon(arguments)
+        return
+
+    variables.SHARD = arguments.shard
+    variables.STATUS = Status(variables.PRINT_UPDATE_INTERVAL)
+    if arguments.time_budget is not None:
+        variables.DEADLINE = time.monotonic() + arguments.time_budget
     variables.PROGRESS = progress.load_progress()
     loader.load_flags()
+    scheduler.load_costs()
+
+    if not arguments.quiet:
+        variables.STATUS.start()
+    try:
+        variables.PROGRESS.process_graphics_locations()
+    finally:
+        variables.STATUS.stop()
+
+    scheduler.save_costs()
+    if not variables.PROGRESS.finished:
+        # Save the progress before logging what was not reached, so that the notes are not carried over when resuming.
+        variables.PROGRESS.save()
+        scheduler.log_unreached()
+        variables.PROGRESS.save_log()
+        logger.print_new("The time budget has been used. Run the script again to continue from where it stopped.")
+    elif variables.SHARD is None:
+        variables.PROGRESS.log_shared_destinations(variables.PROGRESS.get_destinations())
+        variables.PROGRESS.save_log()
+        variables.PROGRESS.delete_progress()
+    else:
+        shard.save_partial_result(arguments.run_id)
+        variables.PROGRESS.delete_progress()
+
 
-    variables.PROGRESS.process_graphics_locations()
+def merge(run_id: str | None) -> None:
+    """Merge the partial results of shards into one log."""
+    variables.PROGRESS = Progress()
+    shard.merge(run_id)
     variables.PROGRESS.save_log()
-    variables.PROGRESS.delete_progress()
+
+
+def generate(arguments: argparse.Namespace) -> None:
+    """Generate a config file for a folder of images."""
+    variables.PROGRESS = Progress()
+    generator.generate(arguments.folder, arguments.template, arguments.output, arguments.overwrite)
+    variables.PROGRESS.save_log()
+
+
+def run_daemon(arguments: argparse.Namespace) -> None:
+    """Validate the graphics locations, and keep validating changes to them on request."""
+    variables.STATUS = Status(variables.PRINT_UPDATE_INTERVAL)
+    variables.PROGRESS = Progress()
+    loader.load_flags()
+
+    daemon = Daemon()
+    if not arguments.quiet:
+        variables.STATUS.start()
+    try:
+        daemon.load()
+    finally:
+        variables.STATUS.stop()
+
+    daemon.serve(arguments.port)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+"""Functions for ordering the work by cost and keeping to the time budget."""
+import json
+import os
+import time
+from pathlib import Path
+
+import logger
+import variables
+
+COST_FILE = "cache/config_costs.json"
+BYTES_PER_RECORD = 80  # Rough size of a record in a config file, used when the record count is not known.
+
+
+def load_costs() -> None:
+    """Load the record counts of the config files from the previous runs."""
+    try:
+        with open(COST_FILE, encoding="utf-8") as file:
+            variables.CONFIG_COSTS = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        variables.CONFIG_COSTS = {}
+
+
+def save_costs() -> None:
+    """Save the record counts of the validated config files for the next runs."""
+    load_costs()
+    for path_object in variables.PROGRESS.paths.values():
+        for config in path_object.config_files.values():
+            if config.validated:
+                variables.CONFIG_COSTS[config.directory] = len(config.records)
+
+    Path(COST_FILE).parent.mkdir(parents=True, exist_ok=True)
+    temporary_file = f"{COST_FILE}.{os.getpid()}.tmp"
+    with open(temporary_file, "w", encoding="utf-8") as file:
+        json.dump(variables.CONFIG_COSTS, file)
+    os.replace(temporary_file, COST_FILE)
+
+
+def get_config_cost(config) -> int:
+    """Get the estimated cost of a config file as an amount of records."""
+    if config.directory in variables.CONFIG_COSTS:
+        return variables.CONFIG_COSTS[config.directory]
+
+    if config.size is None:
+        config.size = os.path.getsize(config.directory)
+
+    return config.size // BYTES_PER_RECORD
+
+
+def get_path_cost(path_object) -> int:
+    """Get the estimated cost of a graphics location as an amount of records."""
+    if path_object.files_found:
+        return sum(get_config_cost(config) for config in path_object.config_files.values())
+
+    prefix = os.path.join(path_object.name, "")
+    return sum(cost for directory, cost in variables.CONFIG_COSTS.items() if directory.startswith(prefix))
+
+
+def order_configs(configs) -> list:
+    """Order the config files from the most expensive to the least expensive."""
+    return sorted(configs, key=get_config_cost, reverse=True)
+
+
+def order_paths(paths) -> list:
+    """Order the graphics locations from the most expensive to the least expensive."""
+    return sorted(paths, key=get_path_cost, reverse=True)
+
+
+def out_of_time() -> bool:
+    """Check if the time budget of the run has been used."""
+    return variables.DEADLINE is not None and time.monotonic() >= variables.DEADLINE
+
+
+def log_unreached() -> None:
+    """Log the graphics locations, config files and other files that were not checked within the time budget."""
+    for path_object in variables.PROGRESS.paths.values():
+        if not path_object.files_found:
+            logger.log("info", f"{path_object.name}: The location was not reached within the time budget.")
+            continue
+
+        for config in order_configs(path_object.config_files.values()):
+            if not config.reached:
+                logger.log("info", f"{config.directory}: The config file was not reached within the time budget.")
+
+        unchecked_files = len(path_object.other_files) - path_object.anomaly_files_checked
+        if not path_object.anomaly_files_identified and unchecked_files:
+            logger.log("info", f"{path_object.name}: {unchecked_files:,} other files were not checked within the "
+                               f"time budget.")
@@ -0,0 +1,169 @@
+"""Functions for splitting the validation across several processes or machines."""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+import logger
+import variables
+
+SHARD_DIRECTORY = "shards"
+
+
+def parse_shard(string: str) -> tuple[int, int]:
+    """Parse a shard argument in the form i/N, where 1 <= i <= N."""
+    match = re.fullmatch(r"\s*(?P<index>\d+)\s*/\s*(?P<count>\d+)\s*", string)
+    if not match:
+        raise argparse.ArgumentTypeError(f"{string} is not a valid shard. Use the form i/N, for example 1/4.")
+
+    index = int(match.group("index"))
+    count = int(match.group("count"))
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"{string} is not a valid shard. The shard number must be between 1 and "
+                                         f"{count}.")
+
+    return index, count
+
+
+def get_shard(directory: str, location: str) -> int:
+    """Get the shard number a directory belongs to.
+
+    The directory is hashed relative to its graphics location, so machines that mount the graphics at different places
+    still agree on the split.
+    """
+    relative_path = os.path.relpath(directory, location).replace(os.sep, "/")
+    digest = hashlib.sha1(relative_path.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % variables.SHARD[1] + 1
+
+
+def in_shard(directory: str, location: str) -> bool:
+    """Check if the directory is processed by this run."""
+    if variables.SHARD is None:
+        return True
+
+    return get_shard(directory, location) == variables.SHARD[0]
+
+
+def parse_run_id(string: str) -> str:
+    """Parse a run ID, which is used as a folder name."""
+    if not re.fullmatch(r"[A-Za-z0-9_.-]+", string) or string in (".", ".."):
+        raise argparse.ArgumentTypeError(f"{string} is not a valid run ID. Use letters, numbers, '_', '.' and '-'.")
+
+    return string
+
+
+def get_run_directory(run_id: str) -> str:
+    """Get the folder of the partial results of a run."""
+    return f"{SHARD_DIRECTORY}/{run_id}"
+
+
+def get_partial_result_name(run_id: str, index: int, count: int) -> str:
+    """Get the filename of a shard's partial result."""
+    return f"{get_run_directory(run_id)}/{index}-of-{count}.json"
+
+
+def save_partial_result(run_id: str) -> None:
+    """Save the findings, records and destination index of this shard."""
+    records = {}
+    unrecorded_images = []
+    for path_object in variables.PROGRESS.paths.values():
+        unrecorded_images.extend(path_object.unrecorded_images)
+        for config in path_object.config_files.values():
+            records[config.directory] = [[record.from_record, record.to_record] for record in config.records]
+
+    index, count = variables.SHARD
+    result = {
+        "run": run_id,
+        "locations": sorted(variables.PROGRESS.paths),
+        "shard": index,
+        "shards": count,
+        "log": variables.PROGRESS.log,
+        "records": records,
+        "destinations": variables.PROGRESS.get_destinations(),
+        "unrecorded_images": unrecorded_images
+    }
+
+    Path(get_run_directory(run_id)).mkdir(parents=True, exist_ok=True)
+    filename = get_partial_result_name(run_id, index, count)
+    with open(f"{filename}.tmp", "w", encoding="utf-8") as file:
+        json.dump(result, file)
+    os.replace(f"{filename}.tmp", filename)
+
+    logger.print_new(f"Partial result of shard {index} / {count} saved to {filename}.")
+
+
+def find_run_id() -> str:
+    """Get the ID of the only run that has partial results."""
+    run_ids = sorted(os.listdir(SHARD_DIRECTORY)) if os.path.isdir(SHARD_DIRECTORY) else []
+    if not run_ids:
+        raise FileNotFoundError(f"No partial results found in the {SHARD_DIRECTORY} folder.")
+    if len(run_ids) > 1:
+        raise ValueError(f"The {SHARD_DIRECTORY} folder has partial results of several runs: {', '.join(run_ids)}. "
+                         f"Choose one with --run-id.")
+
+    return run_ids[0]
+
+
+def load_partial_results(run_id: str) -> list[dict]:
+    """Load the partial results of every shard of a run, making sure that none of them are missing or outdated."""
+    locations = sorted(variables.PROGRESS.paths)
+    results = {}
+    for filename in glob.glob(f"{get_run_directory(run_id)}/*-of-*.json"):
+        with open(filename, encoding="utf-8") as file:
+            result = json.load(file)
+
+        if result.get("run") != run_id:
+            raise ValueError(f"{filename} belongs to the run {result.get('run')}, not {run_id}.")
+        if result["locations"] != locations:
+            raise ValueError(f"{filename} was made with different graphics locations than the current ones.")
+        results[(result["shard"], result["shards"])] = result
+
+    counts = {count for _, count in results}
+    if not counts:
+        raise FileNotFoundError(f"No partial results found for the run {run_id}.")
+    if len(counts) > 1:
+        raise ValueError(f"The run {run_id} has partial results with different shard counts.")
+
+    count = counts.pop()
+    for index in range(1, count + 1):
+        if (index, count) not in results:
+            raise FileNotFoundError(f"Partial result of shard {index} / {count} is missing.")
+
+    return [results[(index, count)] for index in range(1, count + 1)]
+
+
+def merge(run_id: str | None = None) -> None:
+    """Combine the partial results of the shards of a run into one report, and remove the partial results."""
+    if run_id is None:
+        run_id = find_run_id()
+    results = load_partial_results(run_id)
+    logger.print_new(f"Merging the partial results of {len(results):,} shards...")
+
+    config_images = set()
+    destinations = {}
+    unrecorded_images = []
+    for result in results:
+        for priority, string in result["log"].items():
+            variables.PROGRESS.log[priority] += string
+
+        for config_directory, records in result["records"].items():
+            directory = os.path.dirname(config_directory)
+            for from_record, _ in records:
+                config_images.add(os.path.normpath(os.path.join(directory, from_record)))
+
+        for to_record, config_directories in result["destinations"].items():
+            destinations.setdefault(to_record, []).extend(config_directories)
+
+        unrecorded_images.extend(result["unrecorded_images"])
+
+    variables.PROGRESS.log_shared_destinations(destinations)
+
+    for filepath in sorted(unrecorded_images):
+        if os.path.splitext(filepath)[0] not in config_images:
+            logger.log("warning", f"{filepath}: No config record exists for the file.")
+
+    shutil.rmtree(get_run_directory(run_id))
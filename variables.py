@@ -3,8 +3,15 @@
 # Progress variables.
 PROGRESS = None
 
+# Shard of the work done by this run, as (shard number, number of shards). None if the work is not sharded.
+SHARD = None
+
+# Scheduling variables.
+CONFIG_COSTS = {}  # Record counts of the config files from the previous runs.
+DEADLINE = None  # time.monotonic() value at which the run must stop, or None if there is no time budget.
+
 # Print update variables.
-NEXT_UPDATE = 0  # Seconds since the epoch.
+STATUS = None  # Progress counters of the run.
 PRINT_UPDATE_INTERVAL = 1  # Seconds between print updates.
 
 # Flags.